@@ -2,39 +2,111 @@
 API Routes - Ingestion Endpoint
 Handles the POST /ingest endpoint for data ingestion
 """
-from fastapi import APIRouter, Depends, HTTPException
+from celery import chain
+from celery.utils import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List
-import os
 
-from app.models.schemas import VisitRecord, IngestResponse
+from app.models.schemas import VisitRecord, IngestResponse, IngestStatusResponse, VISIT_RECORDS_ADAPTER
 from app.db.database import get_db
 from app.services.csv_service import CSVService
-from app.services.s3_service import S3Service
-from worker.celery_app import process_csv_workflow
+from app.services.ingest_job_service import IngestJobService
+from worker.celery_app import process_intake, process_csv_workflow
 
 router = APIRouter()
 
 
-@router.post("/ingest", response_model=IngestResponse)
-async def ingest_data(records: List[VisitRecord], db: Session = Depends(get_db)):
+def _enqueue_workflow(db: Session, payload: str, csv_filename: str) -> str:
+    """
+    Record a pending ingest job and enqueue its Celery chain
+    Blocks on the database commit and the broker publish - call it from a worker thread
+    
+    Args:
+        db: Database session
+        payload: Validated JSON array of visit records
+        csv_filename: Name the intake CSV will have in S3
+        
+    Returns:
+        Task ID of the process_csv_workflow step
+    """
+    # Fix the workflow task ID up front so the job row exists before the
+    # chain is enqueued, and process_intake can mark it failed
+    task_id = uuid()
+    IngestJobService.create_job(db, task_id, csv_filename)
+    
+    # Hand the already-validated raw JSON to the worker; results of
+    # process_intake (the S3 key) flow into process_csv_workflow
+    workflow = chain(
+        process_intake.s(payload, csv_filename, task_id),
+        process_csv_workflow.s().set(task_id=task_id)
+    )
+    try:
+        workflow.apply_async()
+    except Exception as e:
+        IngestJobService.finish_job(db, task_id, csv_filename, {
+            "status": "failed",
+            "csv_filename": csv_filename,
+            "error": f"Failed to enqueue workflow: {str(e)}"
+        })
+        raise
+    
+    return task_id
+
+
+@router.post(
+    "/ingest",
+    response_model=IngestResponse,
+    status_code=202,
+    # Body is parsed manually below, so describe it for the OpenAPI docs
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": VisitRecord.model_json_schema()}
+                }
+            }
+        }
+    }
+)
+async def ingest_data(
+    request: Request,
+    db: Session = Depends(get_db)
+):
     """
     Ingest patient visit data
     
     Flow:
-    1. Receive JSON array of visit records
-    2. Convert to CSV file
-    3. Upload CSV to S3 (LocalStack)
-    4. Trigger Celery workflow to process the CSV
-    5. Return confirmation with task ID
+    1. Receive JSON array of visit records and validate it in one pass
+    2. Enqueue a Celery chain and return 202 Accepted immediately:
+       a. process_intake - convert to CSV and upload to S3 (LocalStack)
+       b. process_csv_workflow - process the CSV into the database
+    
+    The client never waits on CSV building or S3 I/O; the returned task ID
+    tracks the final workflow step, and its ingest_jobs row is created as
+    "pending" before the chain is enqueued.
     
     Args:
-        records: List of visit records
+        request: Raw request; body is a JSON array of visit records
         db: Database session (dependency injection)
         
     Returns:
         IngestResponse with task ID and file information
     """
+    # Parse and validate the whole payload in pydantic-core (Rust) directly from bytes,
+    # instead of FastAPI's json.loads + per-item validation
+    raw_body = await request.body()
+    try:
+        records = VISIT_RECORDS_ADAPTER.validate_json(raw_body)
+    except ValidationError as e:
+        # Same 422 shape FastAPI produces for declared body parameters
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+        )
+    
     # Validate file size - prevent extremely large uploads
     MAX_RECORDS = 50000  # Configurable limit
     if len(records) > MAX_RECORDS:
@@ -45,28 +117,46 @@ async def ingest_data(records: List[VisitRecord], db: Session = Depends(get_db))
         )
     
     try:
-        # Step 1: Create CSV file from records
-        csv_service = CSVService()
-        csv_filepath = csv_service.create_csv_from_records(records)
-        csv_filename = os.path.basename(csv_filepath)
-        
-        # Step 2: Upload CSV to S3
-        s3_service = S3Service()
-        upload_success = s3_service.upload_file(csv_filepath, csv_filename)
+        csv_filename = CSVService.generate_filename()
         
-        if not upload_success:
-            raise HTTPException(status_code=500, detail="Failed to upload CSV to S3")
-        
-        # Step 3: Trigger Celery workflow
-        # This runs asynchronously in the background
-        task = process_csv_workflow.delay(csv_filename)
+        # The DB commit and broker publish are blocking I/O - keep them off the event loop
+        task_id = await run_in_threadpool(_enqueue_workflow, db, raw_body.decode(), csv_filename)
         
         return IngestResponse(
-            message="Data ingestion started successfully",
+            message="Data ingestion accepted",
             records_received=len(records),
             csv_filename=csv_filename,
-            task_id=task.id
+            task_id=task_id
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+
+
+@router.get("/ingest/{task_id}", response_model=IngestStatusResponse)
+def get_ingest_status(task_id: str, db: Session = Depends(get_db)):
+    """
+    Get the status of an ingestion workflow
+    
+    Status is read from the ingest_jobs table written by the worker,
+    not from the Celery result backend. A plain def endpoint, so FastAPI
+    runs the blocking query in its threadpool.
+    
+    Args:
+        task_id: Task ID returned by POST /ingest
+        db: Database session
+        
+    Returns:
+        IngestStatusResponse - "pending" until the workflow starts processing the CSV
+    """
+    job = IngestJobService.get_job(db, task_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Ingest job {task_id} not found")
+    
+    return IngestStatusResponse(
+        task_id=job.task_id,
+        status=job.status,
+        csv_filename=job.csv_filename,
+        result=job.result
+    )
@@ -3,10 +3,16 @@ API Routes - Patient Endpoints
 Handles GET /patients and GET /patients/<id> endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Literal, Optional
 
-from app.models.schemas import PatientResponse, PaginatedPatientResponse
+from app.models.schemas import (
+    PatientResponse,
+    PaginatedPatientResponse,
+    PATIENT_ADAPTER,
+    PAGINATED_PATIENTS_ADAPTER,
+)
 from app.db.database import get_db
 from app.services.patient_service import PatientService
 
@@ -17,17 +23,24 @@ router = APIRouter()
 async def get_patients(
     page: int = Query(1, ge=1, description="Page number (starts at 1)"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page (max 100)"),
-    mrn: Optional[str] = Query(None, description="Filter by MRN (partial match)"),
-    first_name: Optional[str] = Query(None, description="Filter by first name (partial match)"),
-    last_name: Optional[str] = Query(None, description="Filter by last name (partial match)"),
+    mrn: Optional[str] = Query(None, description="Filter by MRN"),
+    first_name: Optional[str] = Query(None, description="Filter by first name"),
+    last_name: Optional[str] = Query(None, description="Filter by last name"),
+    match_mode: Literal["prefix", "contains"] = Query(
+        "prefix", description="How filters match: 'prefix' (starts with, fastest) or 'contains' (substring)"
+    ),
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor from a previous response's next_cursor (keyset pagination)"),
     db: Session = Depends(get_db)
 ):
     """
     Get paginated list of patients
     
     Features:
-    - Pagination (page and page_size parameters)
-    - Filtering by MRN, first_name, last_name
+    - Keyset pagination (after_id + page_size) - recommended, constant cost per page
+    - Offset pagination (page and page_size parameters) - legacy
+    - Filtering by MRN, first_name, last_name (case-insensitive)
+      - match_mode=prefix (default): value must match the start of the field, index range scan
+      - match_mode=contains: value may appear anywhere in the field
     - Returns patient with person and visit information
     
     Args:
@@ -36,26 +49,37 @@ async def get_patients(
         mrn: Optional MRN filter
         first_name: Optional first name filter
         last_name: Optional last name filter
+        after_id: Optional cursor; when given, page is ignored
+        match_mode: Filter matching mode ("prefix" or "contains")
         db: Database session
         
     Returns:
         PaginatedPatientResponse with patients and pagination metadata
     """
-    patients, total = PatientService.get_patients_paginated(
+    patients, total, next_cursor = PatientService.get_patients_paginated(
         db=db,
         page=page,
         page_size=page_size,
         mrn=mrn,
         first_name=first_name,
-        last_name=last_name
+        last_name=last_name,
+        after_id=after_id,
+        match_mode=match_mode
     )
     
-    return PaginatedPatientResponse(
-        total=total,
-        page=page,
-        page_size=page_size,
-        patients=patients
+    # Validate once from the ORM objects and return the JSON directly;
+    # returning a Response skips FastAPI's second response_model validation pass
+    response = PAGINATED_PATIENTS_ADAPTER.validate_python(
+        {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "patients": patients
+        },
+        from_attributes=True
     )
+    return ORJSONResponse(content=PAGINATED_PATIENTS_ADAPTER.dump_python(response, mode="json"))
 
 
 @router.get("/patients/{patient_id}", response_model=PatientResponse)
@@ -83,4 +107,5 @@ async def get_patient(patient_id: int, db: Session = Depends(get_db)):
     if not patient:
         raise HTTPException(status_code=404, detail=f"Patient with ID {patient_id} not found")
     
-    return patient
+    response = PATIENT_ADAPTER.validate_python(patient, from_attributes=True)
+    return ORJSONResponse(content=PATIENT_ADAPTER.dump_python(response, mode="json"))
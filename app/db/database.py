@@ -2,19 +2,38 @@
 Database Connection and Session Management
 Sets up SQLAlchemy engine and session factory
 """
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Create database engine
 # echo=True would print all SQL queries (useful for debugging)
-engine = create_engine(settings.database_url, echo=False)
+# Pool sizes come from settings so the API and worker processes can differ
+# pool_pre_ping: detect dead connections before use instead of failing the request
+# pool_use_lifo: reuse the most recent connection so idle extras can time out server-side
+# query_cache_size: compiled statements kept per engine, so repeated statements
+#                   (the worker's upserts, the API's page queries) compile once per process
+engine = create_engine(
+    settings.database_url,
+    echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+    pool_use_lifo=True,
+    query_cache_size=settings.db_query_cache_size
+)
 
 # Session factory - creates new database sessions
 # autocommit=False: Changes must be explicitly committed
 # autoflush=False: Prevents automatic flushing before queries
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: Loaded objects stay usable after commit instead of
+#                         re-SELECTing every attribute on next access
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for all database models
 Base = declarative_base()
@@ -39,5 +58,10 @@ def init_db():
     Called during startup to ensure schema exists
     """
     from app.models import models  # Import models to register them
+    
+    # pg_trgm provides the gin_trgm_ops operator class used by the name/MRN search indexes
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    
     Base.metadata.create_all(bind=engine)
-    print("Database initialized successfully")
+    logger.info("Database initialized successfully")
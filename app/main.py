@@ -2,16 +2,29 @@
 Main FastAPI Application
 Entry point for the API server
 """
+import logging
+import sys
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api import ingest, patients
 from app.db.database import init_db
 
+# Configure logging once for the API process
+# Services log per-record details at DEBUG, so they cost nothing at the default INFO level
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+    stream=sys.stdout
+)
+logger = logging.getLogger(__name__)
+
 # Create FastAPI application instance
 app = FastAPI(
     title="Healthcare Data Ingestion API",
     description="API for ingesting and managing patient visit data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson serializes responses in C
 )
 
 # CORS middleware - allows requests from any origin
@@ -35,9 +48,9 @@ async def startup_event():
     Runs when the application starts
     Initializes the database schema
     """
-    print("Starting up...")
+    logger.info("Starting up...")
     init_db()
-    print("Application ready!")
+    logger.info("Application ready!")
 
 
 @app.get("/")
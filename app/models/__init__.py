@@ -1,4 +1,4 @@
 # Database models package
-from app.models.models import Patient, Person, Visit
+from app.models.models import IngestJob, Patient, Person, Visit
 
-__all__ = ["Patient", "Person", "Visit"]
+__all__ = ["IngestJob", "Patient", "Person", "Visit"]
@@ -3,7 +3,7 @@ Database Models
 Defines the schema for Patient, Person, and Visit tables
 Uses SQLAlchemy ORM for object-relational mapping
 """
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -16,6 +16,10 @@ class Patient(Base):
     MRN must be unique across all patients
     """
     __tablename__ = "patients"
+    __table_args__ = (
+        # Trigram index so MRN partial-match (ILIKE '%...%') filters can use an index scan
+        Index("ix_patients_mrn_trgm", "mrn", postgresql_using="gin", postgresql_ops={"mrn": "gin_trgm_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     mrn = Column(String, unique=True, nullable=False, index=True)  # Medical Record Number - unique identifier
@@ -24,8 +28,9 @@ class Patient(Base):
     # Relationships
     # one-to-one with Person (same ID)
     person = relationship("Person", back_populates="patient", uselist=False, cascade="all, delete-orphan")
-    # one-to-many with Visit
-    visits = relationship("Visit", back_populates="patient", cascade="all, delete-orphan")
+    # one-to-many with Visit, oldest first (served by ix_visits_patient_date)
+    visits = relationship("Visit", back_populates="patient", cascade="all, delete-orphan",
+                          order_by="Visit.visit_date")
 
 
 class Person(Base):
@@ -35,10 +40,18 @@ class Person(Base):
     Person ID matches Patient ID (one-to-one relationship)
     """
     __tablename__ = "persons"
+    __table_args__ = (
+        # Trigram indexes for name partial-match (ILIKE '%...%') filters
+        # The plain b-tree on last_name can't serve leading-wildcard patterns
+        Index("ix_persons_first_name_trgm", "first_name", postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}),
+        Index("ix_persons_last_name_trgm", "last_name", postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}),
+        # Composite for lookups on last + first name (also covers last_name alone)
+        Index("ix_persons_last_first", "last_name", "first_name"),
+    )
     
     id = Column(Integer, ForeignKey("patients.id"), primary_key=True)  # Same as Patient ID
     first_name = Column(String, nullable=False)
-    last_name = Column(String, nullable=False, index=True)  # Indexed for filtering
+    last_name = Column(String, nullable=False)  # Indexed via ix_persons_last_first
     birth_date = Column(Date, nullable=False)
     
     # Relationship back to Patient
@@ -53,12 +66,54 @@ class Visit(Base):
     Multiple visits can belong to one patient
     """
     __tablename__ = "visits"
+    __table_args__ = (
+        # Covering index for a patient's visits in date order: loading them is an
+        # index-only scan with no heap fetches or sort (also covers patient_id alone)
+        Index("ix_visits_patient_date", "patient_id", "visit_date",
+              postgresql_include=["id", "visit_account_number", "reason"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     visit_account_number = Column(String, unique=True, nullable=False, index=True)  # Unique visit identifier
-    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False, index=True)  # Links to Patient
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)  # Links to Patient, indexed via ix_visits_patient_date
     visit_date = Column(Date, nullable=False)
     reason = Column(String, nullable=False)
     
     # Relationship back to Patient
     patient = relationship("Patient", back_populates="visits")
+
+
+class IngestJob(Base):
+    """
+    Ingest Job Table
+    Tracks each CSV processing workflow run, keyed by its Celery task ID
+    Clients poll this instead of the Celery result backend (workflow results are not stored there)
+    """
+    __tablename__ = "ingest_jobs"
+    
+    task_id = Column(String, primary_key=True)  # Celery task ID returned by POST /ingest
+    csv_filename = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # pending, processing, completed or failed
+    result = Column(JSON, nullable=True)  # Progress while processing, result summary once finished
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Functional indexes for prefix search: lower(col) LIKE 'x%' can use a b-tree
+# range scan when the index uses the pattern operator class (needed for LIKE
+# under non-C collations). lower() returns text, hence text_pattern_ops.
+Index(
+    "ix_patients_mrn_lower_pattern",
+    func.lower(Patient.mrn).label("mrn_lower"),
+    postgresql_ops={"mrn_lower": "text_pattern_ops"}
+)
+Index(
+    "ix_persons_first_name_lower_pattern",
+    func.lower(Person.first_name).label("first_name_lower"),
+    postgresql_ops={"first_name_lower": "text_pattern_ops"}
+)
+Index(
+    "ix_persons_last_name_lower_pattern",
+    func.lower(Person.last_name).label("last_name_lower"),
+    postgresql_ops={"last_name_lower": "text_pattern_ops"}
+)
@@ -3,9 +3,9 @@ Pydantic Schemas
 Defines request/response models for API validation
 These are different from database models - used for data validation
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from datetime import date
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class VisitRecord(BaseModel):
@@ -19,6 +19,10 @@ class VisitRecord(BaseModel):
     reason: str = Field(..., description="Reason for the visit")
 
 
+# Validates a whole ingestion payload in one pydantic-core call straight from raw JSON bytes
+VISIT_RECORDS_ADAPTER = TypeAdapter(List[VisitRecord])
+
+
 class VisitResponse(BaseModel):
     """Response model for a visit"""
     id: int
@@ -51,17 +55,33 @@ class PatientResponse(BaseModel):
         from_attributes = True
 
 
+# Module-level adapters: response validators/serializers are built once at import
+PATIENT_ADAPTER = TypeAdapter(PatientResponse)
+
+
 class PaginatedPatientResponse(BaseModel):
     """Response model for paginated patient list"""
     total: int = Field(..., description="Total number of patients")
     page: int = Field(..., description="Current page number")
     page_size: int = Field(..., description="Number of items per page")
+    next_cursor: Optional[int] = Field(None, description="Pass as after_id to fetch the next page; null on the last page")
     patients: List[PatientResponse]
 
 
+PAGINATED_PATIENTS_ADAPTER = TypeAdapter(PaginatedPatientResponse)
+
+
 class IngestResponse(BaseModel):
     """Response model for ingestion endpoint"""
     message: str
     records_received: int
     csv_filename: str
     task_id: str
+
+
+class IngestStatusResponse(BaseModel):
+    """Response model for ingestion workflow status"""
+    task_id: str
+    status: str = Field(..., description="pending, processing, completed or failed")
+    csv_filename: Optional[str] = None
+    result: Optional[Dict[str, Any]] = Field(None, description="Workflow result summary once finished")
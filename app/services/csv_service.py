@@ -4,12 +4,19 @@ Handles CSV file creation and parsing
 Converts JSON data to CSV and vice versa
 """
 import csv
+import io
+import logging
 import os
-from datetime import datetime
-from typing import List, Dict
+import tempfile
+import time
+import uuid
+from operator import attrgetter
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
 from app.models.schemas import VisitRecord
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class CSVService:
     """Service class for CSV operations"""
@@ -17,11 +24,60 @@ class CSVService:
     CSV_HEADERS = ['mrn', 'first_name', 'last_name', 'birth_date', 
                    'visit_account_number', 'visit_date', 'reason']
     
+    # Fetches a record's fields as a tuple in CSV_HEADERS order in one C-level call
+    _ROW_FIELDS = attrgetter(*CSV_HEADERS)
+    
+    # In-memory buffers larger than this spill over to a temp file on disk
+    SPOOL_MAX_SIZE = 10 * 1024 * 1024  # 10MB
+    
+    # S3 object metadata marking a CSV with one record per line (no line breaks
+    # inside quoted values) - only such files can be split at line boundaries
+    SINGLE_LINE_METADATA = {'single-line-records': 'true'}
+    
     def __init__(self):
         """Initialize CSV service and ensure upload directory exists"""
         self.upload_dir = settings.upload_dir
         os.makedirs(self.upload_dir, exist_ok=True)
     
+    @staticmethod
+    def generate_filename() -> str:
+        """
+        Generate a unique filename for a new intake CSV
+        A random UUID guarantees concurrent ingests never overwrite each other in S3
+        (a per-second timestamp collided); the date prefix keeps listings sortable by day
+        
+        Returns:
+            Filename (without directory) used both locally and as the S3 key
+        """
+        return f"patient_intake_{time.strftime('%Y%m%d')}_{uuid.uuid4().hex}.csv"
+    
+    @staticmethod
+    def _iter_rows(records: Iterable[VisitRecord]) -> Iterator[Tuple]:
+        """
+        Yield each VisitRecord as a tuple in CSV_HEADERS order
+        map + attrgetter runs entirely in C (no Python frame per row); dates need
+        no conversion because csv writes str(date), which is its ISO format
+        """
+        return map(CSVService._ROW_FIELDS, records)
+    
+    @staticmethod
+    def has_line_breaks(records: Iterable[VisitRecord]) -> bool:
+        """
+        Check whether any field would be written as a quoted multi-line value
+        
+        Args:
+            records: Visit records to check
+            
+        Returns:
+            True if any text field contains a line break
+        """
+        return any(
+            '\n' in value or '\r' in value
+            for row in CSVService._iter_rows(records)
+            for value in row
+            if isinstance(value, str)
+        )
+    
     def create_csv_from_records(self, records: List[VisitRecord]) -> str:
         """
         Convert list of VisitRecord objects to CSV file
@@ -32,48 +88,45 @@ class CSVService:
         Returns:
             Path to the created CSV file
         """
-        # Generate unique filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"patient_intake_{timestamp}.csv"
-        filepath = os.path.join(self.upload_dir, filename)
+        filepath = os.path.join(self.upload_dir, self.generate_filename())
         
         # Write CSV file
         with open(filepath, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=self.CSV_HEADERS)
-            writer.writeheader()
+            writer = csv.writer(csvfile)
+            writer.writerow(self.CSV_HEADERS)
             
-            # Convert each record to dictionary and write
-            for record in records:
-                row = {
-                    'mrn': record.mrn,
-                    'first_name': record.first_name,
-                    'last_name': record.last_name,
-                    'birth_date': record.birth_date.isoformat(),  # Convert date to string
-                    'visit_account_number': record.visit_account_number,
-                    'visit_date': record.visit_date.isoformat(),
-                    'reason': record.reason
-                }
-                writer.writerow(row)
+            # writerows drives the generator from C - no per-row dict
+            writer.writerows(self._iter_rows(records))
         
-        print(f"Created CSV file: {filepath} with {len(records)} records")
+        logger.debug("Created CSV file: %s with %d records", filepath, len(records))
         return filepath
     
-    def parse_csv_file(self, filepath: str) -> List[Dict]:
+    def write_csv_to_buffer(self, records: List[VisitRecord]) -> BinaryIO:
         """
-        Parse CSV file and return list of dictionaries
+        Convert list of VisitRecord objects to CSV bytes without touching disk
+        
+        Small payloads stay entirely in memory; payloads above SPOOL_MAX_SIZE
+        spill over to a temporary file in the upload directory.
+        The caller is responsible for closing the returned buffer.
         
         Args:
-            filepath: Path to the CSV file to parse
+            records: List of visit records to convert
             
         Returns:
-            List of dictionaries, each representing a row
+            Binary file-like object positioned at the start of the CSV data
         """
-        records = []
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE, dir=self.upload_dir)
+        
+        # Wrap the binary buffer so the csv module can write text into it
+        text_buffer = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+        writer = csv.writer(text_buffer)
+        writer.writerow(self.CSV_HEADERS)
+        writer.writerows(self._iter_rows(records))
         
-        with open(filepath, 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                records.append(row)
+        # Detach so closing the wrapper later doesn't close the underlying buffer
+        text_buffer.flush()
+        text_buffer.detach()
+        buffer.seek(0)
         
-        print(f"Parsed {len(records)} records from {filepath}")
-        return records
+        logger.debug("Created in-memory CSV with %d records", len(records))
+        return buffer
@@ -0,0 +1,114 @@
+"""
+Ingest Job Service
+Records the status of CSV processing workflows in the database
+Backs the GET /ingest/{task_id} status endpoint
+"""
+import logging
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.models.models import IngestJob
+
+logger = logging.getLogger(__name__)
+
+
+class IngestJobService:
+    """Service class for ingest job status operations"""
+    
+    @staticmethod
+    def get_job(db: Session, task_id: str) -> Optional[IngestJob]:
+        """
+        Find an ingest job by its Celery task ID
+        
+        Args:
+            db: Database session
+            task_id: Celery task ID of the workflow
+            
+        Returns:
+            IngestJob object if the workflow was enqueued, None otherwise
+        """
+        return db.get(IngestJob, task_id)
+    
+    @staticmethod
+    def create_job(db: Session, task_id: str, csv_filename: str) -> IngestJob:
+        """
+        Record a newly enqueued workflow as pending
+        
+        Args:
+            db: Database session
+            task_id: Celery task ID of the workflow
+            csv_filename: Name the intake CSV will have in S3
+        
+        Returns:
+            The new IngestJob record
+        """
+        job = IngestJob(task_id=task_id, csv_filename=csv_filename, status="pending")
+        db.add(job)
+        db.commit()
+        
+        logger.debug("Ingest job %s pending for %s", task_id, csv_filename)
+        return job
+    
+    @staticmethod
+    def start_job(db: Session, task_id: str, csv_filename: str) -> IngestJob:
+        """
+        Mark a workflow as processing
+        Safe to call again if the task is redelivered
+        
+        Args:
+            db: Database session
+            task_id: Celery task ID of the workflow
+            csv_filename: Name of the CSV file being processed
+            
+        Returns:
+            The IngestJob record
+        """
+        job = db.get(IngestJob, task_id) or IngestJob(task_id=task_id)
+        job.csv_filename = csv_filename
+        job.status = "processing"
+        job.result = None
+        db.add(job)
+        db.commit()
+        
+        logger.debug("Ingest job %s started for %s", task_id, csv_filename)
+        return job
+    
+    @staticmethod
+    def update_progress(db: Session, task_id: str, progress: dict) -> None:
+        """
+        Store the latest progress of a running workflow as its result
+        Replaced by the final result when the workflow finishes
+        
+        Args:
+            db: Database session with no transaction open
+            task_id: Celery task ID of the workflow
+            progress: Progress counters reported after each chunk
+        """
+        job = db.get(IngestJob, task_id)
+        if job is None:
+            return
+        job.result = progress
+        db.commit()
+    
+    @staticmethod
+    def finish_job(db: Session, task_id: str, csv_filename: str, result: dict) -> IngestJob:
+        """
+        Record the final outcome of a workflow
+        
+        Args:
+            db: Database session
+            task_id: Celery task ID of the workflow
+            csv_filename: Name of the CSV file that was processed
+            result: Workflow result dictionary; its "status" becomes the job status
+            
+        Returns:
+            The IngestJob record
+        """
+        job = db.get(IngestJob, task_id) or IngestJob(task_id=task_id)
+        job.csv_filename = csv_filename
+        job.status = result["status"]
+        job.result = result
+        db.add(job)
+        db.commit()
+        
+        logger.debug("Ingest job %s finished with status %s", task_id, job.status)
+        return job
@@ -3,11 +3,104 @@ Patient Service
 Business logic for patient operations
 Handles database queries and patient/visit management
 """
-from sqlalchemy.orm import Session
-from typing import List, Optional, Tuple
+import logging
+import threading
+from cachetools import TTLCache
+from sqlalchemy import func
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+from typing import List, Literal, Optional, Tuple
 from datetime import date
 from app.models.models import Patient, Person, Visit
 from app.models.schemas import PatientResponse
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Staging for COPY-based intake: rows are streamed in with COPY FROM STDIN, then
+# merged into the real tables with INSERT ... SELECT ... ON CONFLICT
+# Plain SQL strings - these run on the psycopg connection directly
+# A temp table is private to its connection (so parallel workers never collide),
+# unlogged, and emptied at every commit
+_CREATE_INTAKE_STAGING_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS intake_staging (
+        mrn text,
+        first_name text,
+        last_name text,
+        birth_date date,
+        visit_account_number text,
+        visit_date date,
+        reason text,
+        seq int4
+    ) ON COMMIT DELETE ROWS
+"""
+_COPY_INTAKE_STAGING_SQL = (
+    "COPY intake_staging (mrn, first_name, last_name, birth_date, "
+    "visit_account_number, visit_date, reason, seq) FROM STDIN WITH (FORMAT BINARY)"
+)
+_INTAKE_STAGING_TYPES = ['text', 'text', 'text', 'date', 'text', 'date', 'text', 'int4']
+
+_MERGE_STAGED_PATIENTS_SQL = """
+    INSERT INTO patients (mrn)
+    SELECT DISTINCT mrn FROM intake_staging
+    ORDER BY mrn
+    ON CONFLICT (mrn) DO NOTHING
+"""
+# Where a patient or visit repeats in the batch, its last row (highest seq) wins
+# Every merge writes in key order (DISTINCT ON's ORDER BY), so unique-index
+# pages are touched sequentially and concurrent merges lock rows in the same order
+_MERGE_STAGED_PERSONS_SQL = """
+    INSERT INTO persons (id, first_name, last_name, birth_date)
+    SELECT DISTINCT ON (s.mrn) p.id, s.first_name, s.last_name, s.birth_date
+    FROM intake_staging s JOIN patients p ON p.mrn = s.mrn
+    ORDER BY s.mrn, s.seq DESC
+    ON CONFLICT (id) DO UPDATE
+    SET first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        birth_date = EXCLUDED.birth_date
+    WHERE (persons.first_name, persons.last_name, persons.birth_date)
+          IS DISTINCT FROM (EXCLUDED.first_name, EXCLUDED.last_name, EXCLUDED.birth_date)
+"""
+_MERGE_STAGED_VISITS_SQL = """
+    INSERT INTO visits (patient_id, visit_account_number, visit_date, reason)
+    SELECT DISTINCT ON (s.visit_account_number) p.id, s.visit_account_number, s.visit_date, s.reason
+    FROM intake_staging s JOIN patients p ON p.mrn = s.mrn
+    ORDER BY s.visit_account_number, s.seq DESC
+    ON CONFLICT (visit_account_number) DO UPDATE
+    SET visit_date = EXCLUDED.visit_date,
+        reason = EXCLUDED.reason
+    WHERE (visits.visit_date, visits.reason) IS DISTINCT FROM (EXCLUDED.visit_date, EXCLUDED.reason)
+    RETURNING (xmax = 0) AS inserted
+"""
+
+# How /patients text filters match: starts-with or substring
+MatchMode = Literal["prefix", "contains"]
+
+# Short-lived cache of /patients page results, keyed on the query parameters
+# Holds (total, patient IDs on the page, next cursor) - never ORM objects, which
+# are bound to the session that loaded them. Writes through this service clear
+# it; writes from other processes (the Celery worker) show up once entries expire.
+_page_cache = TTLCache(maxsize=settings.patients_cache_maxsize, ttl=settings.patients_cache_ttl)
+_page_cache_lock = threading.Lock()
+
+
+def _invalidate_page_cache() -> None:
+    """Drop all cached /patients pages after a write"""
+    with _page_cache_lock:
+        _page_cache.clear()
+
+
+def _text_filter(column, value: str, match_mode: MatchMode):
+    """
+    Build a case-insensitive match filter for a search column
+    
+    prefix:   lower(col) LIKE 'value%' - sargable, served by the lower(col) text_pattern_ops index
+    contains: col ILIKE '%value%'      - served by the pg_trgm GIN index
+    """
+    if match_mode == "prefix":
+        # Escape LIKE wildcards so user input only ever matches literally
+        escaped = value.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return func.lower(column).like(f"{escaped}%", escape="\\")
+    return column.ilike(f"%{value}%")
 
 
 class PatientService:
@@ -31,6 +124,8 @@ class PatientService:
     def get_patient_by_id(db: Session, patient_id: int) -> Optional[Patient]:
         """
         Find a patient by their ID
+        Person and visits are loaded eagerly (JOIN + one IN query) since
+        the API response always serializes both
         
         Args:
             db: Database session
@@ -39,7 +134,12 @@ class PatientService:
         Returns:
             Patient object if found, None otherwise
         """
-        return db.query(Patient).filter(Patient.id == patient_id).first()
+        # Session.get checks the identity map first and skips SQL on a hit
+        return db.get(
+            Patient,
+            patient_id,
+            options=[joinedload(Patient.person), selectinload(Patient.visits)]
+        )
     
     @staticmethod
     def create_patient(db: Session, mrn: str, first_name: str, 
@@ -73,43 +173,11 @@ class PatientService:
         db.add(person)
         db.commit()
         db.refresh(patient)
+        _invalidate_page_cache()
         
-        print(f"Created new patient: MRN={mrn}, ID={patient.id}")
+        logger.debug("Created new patient: MRN=%s, ID=%s", mrn, patient.id)
         return patient
     
-    @staticmethod
-    def update_person(db: Session, patient: Patient, first_name: str, 
-                     last_name: str, birth_date: date) -> None:
-        """
-        Update person information for an existing patient
-        Only updates if values have changed
-        
-        Args:
-            db: Database session
-            patient: Patient object whose person info to update
-            first_name: New first name
-            last_name: New last name
-            birth_date: New birth date
-        """
-        person = patient.person
-        updated = False
-        
-        if person.first_name != first_name:
-            person.first_name = first_name
-            updated = True
-        
-        if person.last_name != last_name:
-            person.last_name = last_name
-            updated = True
-        
-        if person.birth_date != birth_date:
-            person.birth_date = birth_date
-            updated = True
-        
-        if updated:
-            db.commit()
-            print(f"Updated person info for patient MRN={patient.mrn}")
-    
     @staticmethod
     def get_visit_by_account_number(db: Session, visit_account_number: str) -> Optional[Visit]:
         """
@@ -149,107 +217,228 @@ class PatientService:
         db.add(visit)
         db.commit()
         db.refresh(visit)
+        _invalidate_page_cache()
         
-        print(f"Created visit: {visit_account_number} for patient_id={patient_id}")
+        logger.debug("Created visit: %s for patient_id=%s", visit_account_number, patient_id)
         return visit
     
     @staticmethod
-    def update_visit(db: Session, visit: Visit, visit_date: date, reason: str) -> Visit:
+    def upsert_intake_rows(db: Session, rows: List[tuple]) -> Tuple[int, int]:
         """
-        Update an existing visit's information
-        Only updates if values have changed
+        Upsert a batch of intake records (patient, person and visit per row) via COPY
+        Rows are streamed into a temp staging table with binary COPY FROM STDIN -
+        no per-row SQL parsing - then merged with one INSERT ... SELECT ... ON CONFLICT
+        per table, resolving visit patient IDs by joining on MRN
+        Must run inside a transaction (the staging rows are dropped at commit)
         
         Args:
             db: Database session
-            visit: Visit object to update
-            visit_date: New visit date
-            reason: New reason for visit
+            rows: Tuples of (mrn, first_name, last_name, birth_date,
+                  visit_account_number, visit_date, reason)
+                  If a patient or visit appears more than once, its last row wins
             
         Returns:
-            Updated Visit object
+            Tuple of (patients inserted, visits inserted)
         """
-        updated = False
+        if not rows:
+            return 0, 0
         
-        if visit.visit_date != visit_date:
-            visit.visit_date = visit_date
-            updated = True
+        # Number rows in their original order (for last-row-wins), then stage them
+        # sorted by MRN (stable) so the merges read staging in index order
+        staged_rows = sorted(
+            ((*row, seq) for seq, row in enumerate(rows)),
+            key=lambda staged_row: staged_row[0]
+        )
         
-        if visit.reason != reason:
-            visit.reason = reason
-            updated = True
+        # Staging and merging go through the psycopg connection under this session's transaction
+        driver_connection = db.connection().connection.driver_connection
+        driver_connection.execute(_CREATE_INTAKE_STAGING_SQL)
+        with driver_connection.cursor() as cursor:
+            with cursor.copy(_COPY_INTAKE_STAGING_SQL) as copy:
+                copy.set_types(_INTAKE_STAGING_TYPES)
+                for staged_row in staged_rows:
+                    copy.write_row(staged_row)
         
-        if updated:
-            db.commit()
-            db.refresh(visit)
-            print(f"Updated visit: {visit.visit_account_number}")
-        else:
-            print(f"Visit {visit.visit_account_number} unchanged")
+        # The merges only depend on each other server-side (patient IDs are joined
+        # in SQL), so pipeline mode sends all three without waiting for results:
+        # one round trip instead of three (COPY itself can't run in a pipeline)
+        with driver_connection.pipeline():
+            patients_cursor = driver_connection.execute(_MERGE_STAGED_PATIENTS_SQL)
+            driver_connection.execute(_MERGE_STAGED_PERSONS_SQL)
+            visits_cursor = driver_connection.execute(_MERGE_STAGED_VISITS_SQL)
         
-        return visit
-    
-    @staticmethod
-    def bulk_create_visits(db: Session, visits_data: List[dict]) -> int:
-        """
-        Create multiple visits in one bulk operation
-        Much faster than individual inserts for large datasets
+        patients_inserted = patients_cursor.rowcount
+        # Unchanged existing visits aren't returned at all; only inserts count
+        visits_inserted = sum(inserted for inserted, in visits_cursor.fetchall())
         
-        Args:
-            db: Database session
-            visits_data: List of dictionaries with visit data
-                        Each dict should have: patient_id, visit_account_number, visit_date, reason
-        
-        Returns:
-            Number of visits created
-        """
-        try:
-            if not visits_data:
-                return 0
-            
-            db.bulk_insert_mappings(Visit, visits_data)
-            db.commit()
-            print(f"Bulk created {len(visits_data)} visits")
-            return len(visits_data)
-        except Exception as e:
-            db.rollback()
-            print(f"Error in bulk create: {str(e)}")
-            raise e
+        _invalidate_page_cache()
+        return patients_inserted, visits_inserted
     
     @staticmethod
     def get_patients_paginated(db: Session, page: int = 1, page_size: int = 10,
                                mrn: Optional[str] = None,
                                first_name: Optional[str] = None,
-                               last_name: Optional[str] = None) -> Tuple[List[Patient], int]:
+                               last_name: Optional[str] = None,
+                               after_id: Optional[int] = None,
+                               match_mode: MatchMode = "prefix") -> Tuple[List[Patient], int, Optional[int]]:
         """
         Get paginated list of patients with optional filtering
         
+        Two pagination modes:
+        - Keyset (after_id given): seeks past the cursor on the primary key index,
+          so deep pages cost the same as the first page. `page` is ignored.
+        - Offset (legacy, after_id omitted): OFFSET/LIMIT by page number
+        
+        Page results are cached for settings.patients_cache_ttl seconds, so
+        records ingested by the worker can take that long to appear.
+        
         Args:
             db: Database session
-            page: Page number (1-indexed)
+            page: Page number (1-indexed), used only in offset mode
             page_size: Number of items per page
-            mrn: Optional MRN filter (partial match)
-            first_name: Optional first name filter (partial match)
-            last_name: Optional last name filter (partial match)
+            mrn: Optional MRN filter
+            first_name: Optional first name filter
+            last_name: Optional last name filter
+            after_id: Optional cursor - return patients with ID greater than this
+            match_mode: "prefix" (starts with, index range scan) or "contains" (substring)
             
         Returns:
-            Tuple of (list of patients, total count)
+            Tuple of (list of patients, total count, next cursor or None if last page)
+        """
+        # Dashboards poll the same page repeatedly - serve those from the cache
+        # (page is irrelevant in keyset mode, so leave it out of the key there)
+        cache_key = (None if after_id is not None else page, page_size,
+                     mrn, first_name, last_name, after_id, match_mode)
+        with _page_cache_lock:
+            cached = _page_cache.get(cache_key)
+        
+        if cached is not None:
+            total, patient_ids, next_cursor = cached
+            return PatientService._get_patients_by_ids(db, patient_ids), total, next_cursor
+        
+        patients, total, next_cursor = PatientService._query_patients_page(
+            db, page, page_size, mrn, first_name, last_name, after_id, match_mode
+        )
+        
+        with _page_cache_lock:
+            _page_cache[cache_key] = (total, [patient.id for patient in patients], next_cursor)
+        
+        return patients, total, next_cursor
+    
+    @staticmethod
+    def _query_patients_page(db: Session, page: int, page_size: int,
+                             mrn: Optional[str], first_name: Optional[str],
+                             last_name: Optional[str],
+                             after_id: Optional[int],
+                             match_mode: MatchMode) -> Tuple[List[Patient], int, Optional[int]]:
         """
-        query = db.query(Patient).join(Person)
+        Run the filtered page query for get_patients_paginated (uncached)
         
+        Returns:
+            Tuple of (list of patients, total count, next cursor or None if last page)
+        """
         # Apply filters if provided
+        filters = []
+        
         if mrn:
-            query = query.filter(Patient.mrn.ilike(f"%{mrn}%"))
+            filters.append(_text_filter(Patient.mrn, mrn, match_mode))
         
         if first_name:
-            query = query.filter(Person.first_name.ilike(f"%{first_name}%"))
+            filters.append(_text_filter(Person.first_name, first_name, match_mode))
         
         if last_name:
-            query = query.filter(Person.last_name.ilike(f"%{last_name}%"))
+            filters.append(_text_filter(Person.last_name, last_name, match_mode))
+        
+        # Person is populated from the existing join; visits for the whole page
+        # are loaded by a single extra IN query instead of one query per patient
+        eager_options = (contains_eager(Patient.person), selectinload(Patient.visits))
+        
+        # Fetch one extra row to know whether there is a next page
+        limit = page_size + 1
+        
+        if after_id is not None:
+            # Keyset mode: index range seek on patients.id
+            patients = (
+                db.query(Patient)
+                .join(Person)
+                .options(*eager_options)
+                .filter(*filters)
+                .filter(Patient.id > after_id)
+                .order_by(Patient.id)
+                .limit(limit)
+                .all()
+            )
+            total = PatientService._count_patients(db, filters)
+        else:
+            # Offset mode: fetch the page and the total match count in one round trip,
+            # count(*) OVER () is evaluated over all filtered rows before OFFSET/LIMIT
+            offset = (page - 1) * page_size
+            rows = (
+                db.query(Patient, func.count().over().label("total"))
+                .join(Person)
+                .options(*eager_options)
+                .filter(*filters)
+                .order_by(Patient.id)
+                .offset(offset)
+                .limit(limit)
+                .all()
+            )
+            patients = [row.Patient for row in rows]
+            
+            if rows:
+                total = rows[0].total
+            elif offset == 0:
+                total = 0
+            else:
+                # Page is past the end - no rows carry the window total
+                total = PatientService._count_patients(db, filters)
+        
+        has_more = len(patients) > page_size
+        patients = patients[:page_size]
+        next_cursor = patients[-1].id if has_more else None
         
-        # Get total count before pagination
-        total = query.count()
+        return patients, total, next_cursor
+    
+    @staticmethod
+    def _get_patients_by_ids(db: Session, patient_ids: List[int]) -> List[Patient]:
+        """
+        Load a cached page of patients by ID, with person and visits, in ID order
         
-        # Apply pagination
-        offset = (page - 1) * page_size
-        patients = query.offset(offset).limit(page_size).all()
+        Args:
+            db: Database session
+            patient_ids: IDs of the patients on the page
+            
+        Returns:
+            List of patients (any deleted since caching are skipped)
+        """
+        if not patient_ids:
+            return []
         
-        return patients, total
+        return (
+            db.query(Patient)
+            .options(joinedload(Patient.person), selectinload(Patient.visits))
+            .filter(Patient.id.in_(patient_ids))
+            .order_by(Patient.id)
+            .all()
+        )
+    
+    @staticmethod
+    def _count_patients(db: Session, filters: list) -> int:
+        """
+        Count patients matching the given filters
+        Plain count over the filtered join - no ORDER BY, OFFSET or eager loads
+        
+        Args:
+            db: Database session
+            filters: SQLAlchemy filter expressions on Patient/Person
+            
+        Returns:
+            Number of matching patients
+        """
+        return (
+            db.query(func.count(Patient.id))
+            .select_from(Patient)
+            .join(Person)
+            .filter(*filters)
+            .scalar()
+        )
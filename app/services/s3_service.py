@@ -4,28 +4,88 @@ Handles all interactions with AWS S3 (LocalStack)
 Provides upload and download functionality for CSV files
 """
 import boto3
-import os
+import io
+import logging
+from functools import lru_cache
+from typing import BinaryIO, Dict, Optional, Tuple
 from botocore.client import Config
 from boto3.s3.transfer import TransferConfig
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Shared transfer settings for all uploads/downloads
+# TransferManager picks single-part vs multipart itself; smaller parts with more
+# concurrency keep more TCP windows in flight on large files
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,  # 8MB
+    multipart_chunksize=5 * 1024 * 1024,  # 5MB parts (S3 minimum)
+    max_concurrency=25,                   # Stays under the client's 50 pooled connections
+    use_threads=True
+)
+
+
+@lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Build the shared S3 client once per process
+    boto3 clients are thread-safe; reusing one keeps its connection pool
+    (and keep-alive connections) alive across requests
+    Uses LocalStack endpoint for local development
+    """
+    return boto3.client(
+        's3',
+        endpoint_url=settings.s3_endpoint_url,
+        aws_access_key_id=settings.aws_access_key_id,
+        aws_secret_access_key=settings.aws_secret_access_key,
+        region_name=settings.aws_region,
+        config=Config(
+            signature_version='s3v4',  # Signature version for compatibility
+            max_pool_connections=50,   # Enough for concurrent uploads/multipart parts
+            tcp_keepalive=True
+        )
+    )
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Raw file-like view of an S3 object body as it streams in
+    Counts bytes received so callers can report progress against content_length
+    Wrap in io.BufferedReader for efficient small reads
+    """
+    
+    def __init__(self, body, content_length: int):
+        self._body = body
+        self.content_length = content_length
+        self.bytes_read = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._body.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._body.close()
+        super().close()
+
 
 class S3Service:
     """Service class for S3 operations"""
     
-    def __init__(self):
-        """
-        Initialize S3 client
-        Uses LocalStack endpoint for local development
-        """
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=settings.s3_endpoint_url,
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=settings.aws_region,
-            config=Config(signature_version='s3v4')  # Signature version for compatibility
-        )
+    def __init__(self, s3_client=None):
+        """
+        Initialize S3 service
+        
+        Args:
+            s3_client: Optional boto3 S3 client; defaults to the shared process-wide client
+        """
+        self.s3_client = s3_client or get_s3_client()
         self.bucket_name = settings.s3_bucket_name
     
     def upload_file(self, file_path: str, object_name: str) -> bool:
@@ -40,34 +100,46 @@ class S3Service:
             True if upload successful, False otherwise
         """
         try:
-            file_size = os.path.getsize(file_path)
+            self.s3_client.upload_file(
+                file_path,
+                self.bucket_name,
+                object_name,
+                Config=TRANSFER_CONFIG
+            )
             
-            # Use multipart upload for files > 10MB
-            if file_size > 10 * 1024 * 1024:  # 10MB threshold
-                print(f"Using multipart upload for large file ({file_size / (1024*1024):.2f} MB)")
-                
-                # Configure multipart upload
-                config = TransferConfig(
-                    multipart_threshold=10 * 1024 * 1024,  # 10MB
-                    max_concurrency=10,
-                    multipart_chunksize=10 * 1024 * 1024,  # 10MB chunks
-                    use_threads=True
-                )
-                
-                self.s3_client.upload_file(
-                    file_path,
-                    self.bucket_name,
-                    object_name,
-                    Config=config
-                )
-            else:
-                # Regular upload for smaller files
-                self.s3_client.upload_file(file_path, self.bucket_name, object_name)
+            logger.info("Successfully uploaded %s to s3://%s/%s", file_path, self.bucket_name, object_name)
+            return True
+        except Exception as e:
+            logger.error("Error uploading to S3: %s", e)
+            return False
+    
+    def upload_fileobj(self, fileobj: BinaryIO, object_name: str,
+                       metadata: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Upload the contents of a binary file-like object to S3 bucket
+        Avoids writing the data to a local file first
+        
+        Args:
+            fileobj: Readable binary file-like object (e.g. an in-memory CSV buffer)
+            object_name: Name to give the file in S3
+            metadata: Optional user metadata to store with the object
             
-            print(f"Successfully uploaded {file_path} to s3://{self.bucket_name}/{object_name}")
+        Returns:
+            True if upload successful, False otherwise
+        """
+        try:
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                object_name,
+                ExtraArgs={'Metadata': metadata} if metadata else None,
+                Config=TRANSFER_CONFIG
+            )
+            
+            logger.debug("Successfully uploaded buffer to s3://%s/%s", self.bucket_name, object_name)
             return True
         except Exception as e:
-            print(f"Error uploading to S3: {str(e)}")
+            logger.error("Error uploading to S3: %s", e)
             return False
     
     def download_file(self, object_name: str, file_path: str) -> bool:
@@ -82,13 +154,71 @@ class S3Service:
             True if download successful, False otherwise
         """
         try:
-            self.s3_client.download_file(self.bucket_name, object_name, file_path)
-            print(f"Successfully downloaded s3://{self.bucket_name}/{object_name} to {file_path}")
+            self.s3_client.download_file(self.bucket_name, object_name, file_path, Config=TRANSFER_CONFIG)
+            logger.info("Successfully downloaded s3://%s/%s to %s", self.bucket_name, object_name, file_path)
             return True
         except Exception as e:
-            print(f"Error downloading from S3: {str(e)}")
+            logger.error("Error downloading from S3: %s", e)
             return False
     
+    def get_object_size(self, object_name: str) -> Optional[int]:
+        """
+        Get the size of an S3 object without downloading it
+        
+        Args:
+            object_name: Name of the file in S3
+            
+        Returns:
+            Size in bytes, or None on error
+        """
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=object_name)['ContentLength']
+        except Exception as e:
+            logger.error("Error reading S3 object metadata: %s", e)
+            return None
+    
+    def get_object_metadata(self, object_name: str) -> Optional[Dict[str, str]]:
+        """
+        Get the user metadata stored with an S3 object
+        
+        Args:
+            object_name: Name of the file in S3
+            
+        Returns:
+            Metadata dictionary (empty if none was set), or None on error
+        """
+        try:
+            return self.s3_client.head_object(Bucket=self.bucket_name, Key=object_name)['Metadata']
+        except Exception as e:
+            logger.error("Error reading S3 object metadata: %s", e)
+            return None
+    
+    def open_object(self, object_name: str,
+                    byte_range: Optional[Tuple[int, int]] = None) -> Optional[S3ObjectReader]:
+        """
+        Open an S3 object (or a byte range of it) for streaming reads over a single GET
+        Lets callers parse the data as it arrives instead of downloading it first
+        
+        Args:
+            object_name: Name of the file in S3
+            byte_range: Optional (start, end) byte offsets to read, end exclusive
+            
+        Returns:
+            Reader over the object body (caller must close it), or None on error
+        """
+        try:
+            extra_args = {}
+            if byte_range is not None:
+                extra_args['Range'] = f"bytes={byte_range[0]}-{byte_range[1] - 1}"  # HTTP ranges are inclusive
+            
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=object_name, **extra_args)
+            logger.debug("Streaming s3://%s/%s (%d bytes)", self.bucket_name, object_name,
+                        response['ContentLength'])
+            return S3ObjectReader(response['Body'], response['ContentLength'])
+        except Exception as e:
+            logger.error("Error opening S3 object: %s", e)
+            return None
+    
     def list_files(self) -> list:
         """
         List all files in the S3 bucket
@@ -102,5 +232,5 @@ class S3Service:
                 return [obj['Key'] for obj in response['Contents']]
             return []
         except Exception as e:
-            print(f"Error listing S3 files: {str(e)}")
+            logger.error("Error listing S3 files: %s", e)
             return []
@@ -0,0 +1,40 @@
+"""
+Tests for the worker's intake file parsing
+"""
+import csv
+import io
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.services.csv_service import CSVService
+from worker.celery_app import _iter_chunks
+
+
+def _build_csv(record_count: int) -> bytes:
+    """Build an intake CSV the way CSVService writes it, with multi-line reasons"""
+    text_buffer = io.StringIO(newline='')
+    writer = csv.writer(text_buffer)
+    writer.writerow(CSVService.CSV_HEADERS)
+    for i in range(record_count):
+        writer.writerow([
+            f"MRN-{i}", "Jane", "Doe", "1990-02-14", f"VST-{i}", "2024-11-01",
+            f"Follow-up {i}\nNotes: patient reports\r\nmild symptoms, padding {'x' * 40}"
+        ])
+    return text_buffer.getvalue().encode('utf-8')
+
+
+def test_iter_chunks_keeps_newlines_in_quoted_values_across_blocks():
+    data = _build_csv(30000)
+    # Must span several of the reader's 1MB blocks to exercise record boundaries
+    assert len(data) > 3 * 1024 * 1024
+    
+    rows = [row for columns in _iter_chunks(io.BytesIO(data), "intake.csv") for row in zip(*columns)]
+    
+    assert len(rows) == 30000
+    mrn, first_name, last_name, birth_date, visit_account_number, visit_date, reason = rows[-1]
+    assert mrn == "MRN-29999"
+    assert visit_account_number == "VST-29999"
+    assert birth_date.isoformat() == "1990-02-14"
+    assert reason.startswith("Follow-up 29999\nNotes: patient reports\r\nmild symptoms")
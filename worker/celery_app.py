@@ -2,21 +2,41 @@
 Celery Application and Workflow
 Handles asynchronous processing of CSV files from S3
 """
-from celery import Celery, current_task
+from celery import Celery, chord
+from celery.signals import after_setup_logger, worker_process_init, worker_process_shutdown
+from concurrent.futures import ThreadPoolExecutor
+from kombu import Exchange, Queue
 from sqlalchemy.orm import Session
-from datetime import datetime
+from psycopg import errors as pg_errors
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import csv
+import gzip
+import io
+import logging
 import os
+import queue
+import shutil
 import sys
-import pandas as pd
+import tempfile
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.config import settings
 from app.db.database import SessionLocal
-from app.services.s3_service import S3Service
+from app.services.s3_service import S3Service, get_s3_client
 from app.services.csv_service import CSVService
 from app.services.patient_service import PatientService
+from app.services.ingest_job_service import IngestJobService
+from app.models.schemas import VISIT_RECORDS_ADAPTER
 
 # Initialize Celery application
 celery_app = Celery(
@@ -27,190 +47,727 @@ celery_app = Celery(
 
 # Celery configuration
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    # msgpack: smaller messages and faster (de)serialization than JSON
+    task_serializer='msgpack',
+    accept_content=['msgpack'],
+    result_serializer='msgpack',
+    # Ingest messages are transient (non-persistent delivery) - a lost enqueue
+    # is recovered by the client retrying POST /ingest
+    task_queues=(
+        Queue('ingest', Exchange('ingest', delivery_mode=1), routing_key='ingest', durable=False),
+    ),
+    task_default_queue='ingest',
+    task_default_exchange='ingest',
+    task_default_routing_key='ingest',
     timezone='UTC',
     enable_utc=True,
+    # Ingest tasks are long-running: ack only after completion and don't let a
+    # worker reserve extra messages that would sit behind a big CSV
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
 )
 
+# Log level comes from the worker's --loglevel; per-record messages are DEBUG
+logger = logging.getLogger(__name__)
 
-@celery_app.task(name="process_csv_workflow", bind=True)
+# Background thread writing queued log records to the real handlers
+_log_listener = None
+_log_listener_pid = None
+
+
+def _start_log_listener(log_queue, handlers) -> None:
+    """Start a QueueListener for this process, flushed on exit"""
+    global _log_listener, _log_listener_pid
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    _log_listener_pid = os.getpid()
+    atexit.register(_log_listener.stop)
+
+
+@after_setup_logger.connect
+def _queue_log_handlers(**kwargs):
+    """
+    Put a QueueHandler in front of the handlers Celery configured
+    QueueHandler.prepare() still formats each record on the calling task
+    thread, but writing to stdout happens on the listener thread, so a slow
+    or blocked stream never stalls a task
+    """
+    root_logger = kwargs['logger']
+    handlers = root_logger.handlers[:]
+    log_queue = queue.SimpleQueue()
+    
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+    _start_log_listener(log_queue, handlers)
+
+
+@worker_process_init.connect
+def _restart_log_listener(**kwargs):
+    """Threads don't survive fork: give each pool process its own listener"""
+    if _log_listener is not None and _log_listener_pid != os.getpid():
+        _start_log_listener(_log_listener.queue, _log_listener.handlers)
+
+
+@worker_process_shutdown.connect
+def _stop_log_listener(**kwargs):
+    """
+    Flush queued records before a pool process exits
+    Pool processes leave via os._exit, which skips the atexit stop
+    """
+    if _log_listener is not None and _log_listener_pid == os.getpid():
+        _log_listener.stop()
+
+
+# Services shared by every task in a worker process (the S3 client's
+# connection pool and credentials are reused across tasks)
+_s3_service = None
+_csv_service = None
+
+
+@worker_process_init.connect
+def _init_services(**kwargs):
+    """
+    Build each pool process's services after fork
+    A boto3 client (and its sockets) must not be shared across processes, so
+    drop any client inherited from the parent before building the services
+    """
+    global _s3_service, _csv_service
+    get_s3_client.cache_clear()
+    _s3_service = S3Service()
+    _csv_service = CSVService()
+
+
+def _get_services() -> Tuple[S3Service, CSVService]:
+    """Process-wide S3 and CSV services, built on first use if no pool process init ran (e.g. --pool=solo)"""
+    global _s3_service, _csv_service
+    if _s3_service is None or _csv_service is None:
+        _s3_service = S3Service()
+        _csv_service = CSVService()
+    return _s3_service, _csv_service
+
+
+# How pyarrow reads intake CSVs (written by CSVService)
+# Every column is read as a string (an MRN like "00123" must not become 123);
+# date columns are then parsed per chunk in one vectorized call, so a malformed
+# date fails only its own row instead of the whole block
+CSV_COLUMN_TYPES = {column: pa.string() for column in CSVService.CSV_HEADERS}
+CSV_DATE_COLUMNS = ['birth_date', 'visit_date']
+CSV_DATE_FORMAT = '%Y-%m-%d'
+
+
+# Result is only consumed by the next task in the chain (passed in the message),
+# so it never needs to be written to the result backend
+@celery_app.task(name="process_intake", ignore_result=True)
+def process_intake(payload: str, csv_filename: str, task_id: str) -> str:
+    """
+    Convert a raw ingestion payload to CSV and upload it to S3
+    First step of the ingestion chain - its return value is passed to process_csv_workflow
+    On failure the workflow's job is marked failed and the chain stops
+    
+    Args:
+        payload: JSON array of visit records, as received by POST /ingest
+        csv_filename: Name to give the CSV file in S3
+        task_id: Celery task ID of the process_csv_workflow step (the job's key)
+        
+    Returns:
+        Name of the uploaded CSV file in S3
+    """
+    logger.info("[INTAKE] Building %s", csv_filename)
+    
+    try:
+        # Payload was already validated by the API; this just rebuilds the records
+        records = VISIT_RECORDS_ADAPTER.validate_json(payload)
+        
+        s3_service, csv_service = _get_services()
+        
+        # Mark files the workflow may split by byte range (see _is_splittable)
+        metadata = None if csv_service.has_line_breaks(records) else CSVService.SINGLE_LINE_METADATA
+        
+        csv_buffer = csv_service.write_csv_to_buffer(records)
+        try:
+            upload_success = s3_service.upload_fileobj(csv_buffer, csv_filename, metadata)
+        finally:
+            csv_buffer.close()
+        
+        if not upload_success:
+            raise Exception(f"Failed to upload {csv_filename} to S3")
+        
+    except Exception as e:
+        error_msg = f"Intake failed: {str(e)}"
+        logger.error("[INTAKE FAILED] %s", error_msg)
+        
+        db = SessionLocal()
+        try:
+            IngestJobService.finish_job(db, task_id, csv_filename, {
+                "status": "failed",
+                "csv_filename": csv_filename,
+                "error": error_msg
+            })
+        except Exception as status_error:
+            logger.error("[INTAKE FAILED] Could not record job status: %s", status_error)
+        finally:
+            db.close()
+        
+        # Re-raise so the chain never runs process_csv_workflow
+        raise
+    
+    logger.info("[INTAKE] Uploaded %d records to %s", len(records), csv_filename)
+    return csv_filename
+
+
+# Records parsed and upserted per transaction
+CHUNK_SIZE = 500
+
+# Counters every segment reports; summed into the workflow result
+SEGMENT_COUNT_KEYS = ('processed_records', 'patients_created', 'patients_updated',
+                      'visits_created', 'visits_updated')
+
+# How far past a segment's nominal start to look for the next line break
+LINE_PROBE_BYTES = 64 * 1024
+
+# Attempts per chunk transaction when concurrent segments deadlock on the same rows
+CHUNK_WRITE_ATTEMPTS = 3
+
+# Parsed chunks allowed to queue up ahead of the database writes
+PREFETCH_CHUNKS = 4
+_END_OF_CHUNKS = object()
+
+
+def _is_parquet(filename: str) -> bool:
+    """Whether an intake object is read as Parquet"""
+    return filename.endswith('.parquet')
+
+
+def _is_gzip(filename: str) -> bool:
+    """Whether an intake object is gzip-compressed CSV"""
+    return filename.endswith('.gz')
+
+
+def _is_plain_csv(filename: str) -> bool:
+    """Whether an intake object is uncompressed CSV (the only format that can be split by byte range)"""
+    return not (_is_parquet(filename) or _is_gzip(filename))
+
+
+def _is_splittable(s3_service: S3Service, csv_filename: str) -> bool:
+    """
+    Whether an intake object can be split into byte ranges at line breaks
+    Only plain CSV uploaded with CSVService.SINGLE_LINE_METADATA qualifies: a
+    quoted value with a line break would put a false boundary inside a record
+    """
+    if not _is_plain_csv(csv_filename):
+        return False
+    metadata = s3_service.get_object_metadata(csv_filename) or {}
+    return all(metadata.get(key) == value for key, value in CSVService.SINGLE_LINE_METADATA.items())
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether a failed chunk transaction lost a lock race and can simply be run again"""
+    error = getattr(error, 'orig', None) or error  # Unwrap SQLAlchemy's DBAPIError
+    return isinstance(error, (pg_errors.DeadlockDetected, pg_errors.SerializationFailure))
+
+
+def _to_strings(column: pa.Array) -> list:
+    """Convert a column to str values, None where null (Parquet columns may be typed, e.g. an integer MRN)"""
+    if not pa.types.is_string(column.type):
+        column = column.cast(pa.string())
+    return column.to_pylist()
+
+
+def _to_dates(column: pa.Array) -> list:
+    """Convert a column to datetime.date values (None where missing or malformed)"""
+    if pa.types.is_string(column.type):
+        column = pc.strptime(column, format=CSV_DATE_FORMAT, unit='s', error_is_null=True)
+    return column.cast(pa.date32()).to_pylist()
+
+
+def _iter_parquet_batches(stream) -> Iterator[pa.RecordBatch]:
+    """
+    Read a Parquet object in CHUNK_SIZE record batches
+    Parquet needs random access (its footer is at the end of the file), so the
+    object is buffered first - in memory, spilling to disk if it is large
+    """
+    with tempfile.SpooledTemporaryFile(max_size=CSVService.SPOOL_MAX_SIZE) as buffer:
+        shutil.copyfileobj(stream, buffer, 1024 * 1024)
+        buffer.seek(0)
+        yield from pq.ParquetFile(buffer).iter_batches(
+            batch_size=CHUNK_SIZE, columns=CSVService.CSV_HEADERS
+        )
+
+
+def _iter_chunks(stream, filename: str, column_names: Optional[List[str]] = None) -> Iterator[list]:
+    """
+    Parse an intake stream into chunks of at most CHUNK_SIZE records
+    The format follows the object name: .parquet is read as Parquet, .gz
+    (e.g. .csv.gz) is decompressed as it streams, anything else is plain CSV
+    pyarrow's streaming CSV reader parses 1MB blocks on background threads
+    straight into columnar buffers
+    
+    Columns are picked by name, so a file with its columns in another order
+    (or with extra columns) parses correctly; a missing CSV_HEADERS column
+    raises instead of shifting values into the wrong fields
+    
+    Args:
+        stream: Binary file-like object positioned at the start of a line
+        filename: Name of the intake object in S3
+        column_names: Header of the file, for CSV segments that don't start
+                      with the header row; None reads it from the stream
+        
+    Yields:
+        One list of column values per CSV_HEADERS column, dates as datetime.date
+    """
+    if _is_parquet(filename):
+        batches = _iter_parquet_batches(stream)
+    else:
+        source = io.BufferedReader(stream, buffer_size=1024 * 1024)
+        if _is_gzip(filename):
+            source = gzip.GzipFile(fileobj=source)
+        
+        batches = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(
+                column_names=column_names,
+                block_size=1024 * 1024,
+                use_threads=True
+            ),
+            # Free-text fields (e.g. reason) may hold line breaks inside quotes;
+            # without this, a record spanning a block boundary breaks the parser
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types=CSV_COLUMN_TYPES,
+                include_columns=CSVService.CSV_HEADERS  # Errors if any are missing
+            )
+        )
+    
+    for batch in batches:
+        # Batch sizes follow block_size; re-slice so each transaction stays CHUNK_SIZE rows
+        for offset in range(0, batch.num_rows, CHUNK_SIZE):
+            chunk = batch.slice(offset, CHUNK_SIZE)
+            yield [
+                _to_dates(chunk.column(column)) if column in CSV_DATE_COLUMNS
+                else _to_strings(chunk.column(column))
+                for column in CSVService.CSV_HEADERS
+            ]
+
+
+def _prefetch_chunks(chunks: Iterator[list]) -> Iterator[list]:
+    """
+    Run a chunk iterator on a background thread, up to PREFETCH_CHUNKS ahead
+    S3 reads, decompression and pyarrow parsing release the GIL, so parsing the
+    next chunks overlaps the database writes for the current one; throughput
+    approaches the slower of the two instead of their sum
+    
+    Args:
+        chunks: Iterator of parsed chunks (consumed on the background thread)
+        
+    Yields:
+        The same chunks, in order; a parsing error is re-raised here
+    """
+    chunk_queue = queue.Queue(maxsize=PREFETCH_CHUNKS)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        # Give up if the consumer has gone away, rather than blocking on a full queue
+        while not stop.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+            put(_END_OF_CHUNKS)
+        except Exception as e:
+            put(e)
+        finally:
+            chunks.close()
+    
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-parser") as executor:
+        executor.submit(produce)
+        try:
+            while True:
+                item = chunk_queue.get()
+                if item is _END_OF_CHUNKS:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+
+def _process_segment(db: Session, stream, filename: str, column_names: Optional[List[str]] = None,
+                     on_progress=None) -> dict:
+    """
+    Parse a stream of CSV records and upsert it chunk by chunk
+    Shared by single-task processing and the parallel process_chunk segments
+    
+    Args:
+        db: Database session with no transaction open
+        stream: S3ObjectReader positioned at the start of a line
+        filename: Name of the intake object in S3 (selects the file format)
+        column_names: Header of the file for byte-range segments after the
+                      first, which don't start with the header row
+        on_progress: Optional callback receiving a progress dict after each chunk,
+                     called with no transaction open
+        
+    Returns:
+        Dictionary with the SEGMENT_COUNT_KEYS counters, a list of errors
+        and a failed flag (False - a segment that can't be read raises)
+    """
+    patients_created = 0
+    patients_updated = 0
+    visits_created = 0
+    visits_updated = 0
+    errors = []
+    processed_count = 0
+    
+    for chunk_num, columns in enumerate(_prefetch_chunks(_iter_chunks(stream, filename, column_names)), 1):
+        logger.debug("[CHUNK %d] Processing %d records...", chunk_num, len(columns[0]))
+        
+        # Rows collected for this chunk's upserts
+        chunk_rows = []
+        
+        # Rows come out in CSV_HEADERS order: mrn, first_name, last_name, birth_date,
+        # visit_account_number, visit_date, reason
+        for row in zip(*columns):
+            processed_count += 1
+            try:
+                # Every field is required: empty CSV fields arrive as '', and
+                # missing or malformed dates as None
+                missing = [column for column, value in zip(CSVService.CSV_HEADERS, row)
+                           if value is None or value == '']
+                if missing:
+                    raise ValueError(f"missing or invalid {', '.join(missing)}")
+                
+                chunk_rows.append(row)
+                
+            except Exception as e:
+                error_msg = f"Error processing record {processed_count} (MRN={row[0]}): {str(e)}"
+                logger.debug("    ERROR: %s", error_msg)
+                errors.append(error_msg)
+                # Continue processing other records even if one fails
+                continue
+        
+        # Upsert the chunk: COPY into staging, then one INSERT ... SELECT ...
+        # ON CONFLICT per table, with the database deciding new vs existing on
+        # the unique indexes (no lookups, one transaction for the whole chunk,
+        # and safe to run concurrently with other segments touching the same patients)
+        try:
+            for attempt in range(1, CHUNK_WRITE_ATTEMPTS + 1):
+                try:
+                    with db.no_autoflush, db.begin():
+                        new_patients, new_visits = PatientService.upsert_intake_rows(db, chunk_rows)
+                    break
+                except Exception as e:
+                    if attempt == CHUNK_WRITE_ATTEMPTS or not _is_retryable(e):
+                        raise
+                    # Segments upserting the same patients can deadlock; the
+                    # database aborted this transaction, so run it again
+                    logger.warning("[CHUNK %d] Retrying after %s (attempt %d)", chunk_num, type(e).__name__, attempt)
+                    time.sleep(0.1 * attempt)
+            
+            logger.info("[CHUNK %d] Committed %d records to database", chunk_num, len(chunk_rows))
+            
+            # Every row that didn't insert (existing, or repeated in the chunk) is an update
+            patients_created += new_patients
+            patients_updated += len(chunk_rows) - new_patients
+            visits_created += new_visits
+            visits_updated += len(chunk_rows) - new_visits
+        except Exception as e:
+            # db.begin() rolled the transaction back - nothing from this chunk was written
+            error_msg = f"Error writing chunk {chunk_num}: {str(e)}"
+            logger.warning("    ERROR: %s", error_msg)
+            errors.append(error_msg)
+        
+        # Publish progress once per chunk - each update is a database write
+        if on_progress is not None:
+            # The row count isn't known up front (that would take an extra
+            # pass over the file), so report chunks and bytes instead
+            progress = int(stream.bytes_read * 100 / max(stream.content_length, 1))
+            on_progress({
+                'current_chunk': chunk_num,
+                'chunks_processed': chunk_num,
+                'records_processed': processed_count,
+                'percent_bytes': progress,
+                'patients_created': patients_created,
+                'patients_updated': patients_updated,
+                'visits_created': visits_created,
+                'visits_updated': visits_updated
+            })
+            logger.debug("  Progress: %d%% of bytes (chunk %d, %d records)", progress, chunk_num, processed_count)
+    
+    return {
+        'processed_records': processed_count,
+        'patients_created': patients_created,
+        'patients_updated': patients_updated,
+        'visits_created': visits_created,
+        'visits_updated': visits_updated,
+        'errors': errors,
+        'failed': False
+    }
+
+
+def _read_csv_header(s3_service: S3Service, csv_filename: str, size: int) -> List[str]:
+    """
+    Read the header row of a CSV file in S3, for segments that start mid-file
+    
+    Args:
+        s3_service: S3 service to probe the object with
+        csv_filename: Name of the CSV file in S3
+        size: Object size in bytes
+        
+    Returns:
+        Column names in file order
+    """
+    probe = s3_service.open_object(csv_filename, (0, min(LINE_PROBE_BYTES, size)))
+    if probe is None:
+        raise Exception(f"Failed to read the header of {csv_filename}")
+    try:
+        first_line = probe.readall().split(b'\n', 1)[0]
+    finally:
+        probe.close()
+    
+    header = next(csv.reader([first_line.decode('utf-8-sig')]), [])
+    missing = [column for column in CSVService.CSV_HEADERS if column not in header]
+    if missing:
+        raise Exception(f"{csv_filename} header is missing columns: {', '.join(missing)}")
+    return header
+
+
+def _segment_ranges(s3_service: S3Service, csv_filename: str, size: int,
+                    segment_size: int) -> List[Tuple[int, int]]:
+    """
+    Split an S3 object into byte ranges that each start at the beginning of a line
+    
+    Requires one record per line (no line breaks inside quoted fields), the same
+    assumption line-splitting CSV readers such as Spark's make by default;
+    callers check it with _is_splittable first.
+    A nominal boundary with no line break within LINE_PROBE_BYTES is dropped,
+    merging that stretch into the previous range.
+    
+    Args:
+        s3_service: S3 service to probe the object with
+        csv_filename: Name of the CSV file in S3
+        size: Object size in bytes
+        segment_size: Target bytes per range
+        
+    Returns:
+        List of (start, end) byte offsets, end exclusive
+    """
+    boundaries = [0]
+    for target in range(segment_size, size, segment_size):
+        probe = s3_service.open_object(csv_filename, (target, min(target + LINE_PROBE_BYTES, size)))
+        if probe is None:
+            raise Exception(f"Failed to read {csv_filename} at byte {target}")
+        try:
+            newline = probe.readall().find(b'\n')
+        finally:
+            probe.close()
+        
+        if newline != -1:
+            boundaries.append(target + newline + 1)
+    boundaries.append(size)
+    
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def _build_result(csv_filename: str, segment_results: List[dict]) -> dict:
+    """
+    Combine segment counters into the workflow result stored in ingest_jobs
+    
+    Args:
+        csv_filename: Name of the CSV file that was processed
+        segment_results: _process_segment results, in file order
+        
+    Returns:
+        Dictionary with processing results - "failed" if any segment failed outright
+    """
+    totals = {key: sum(segment[key] for segment in segment_results) for key in SEGMENT_COUNT_KEYS}
+    errors = [error for segment in segment_results for error in segment['errors']]
+    failed = any(segment['failed'] for segment in segment_results)
+    
+    logger.info(
+        "[WORKFLOW COMPLETE] Patients created: %d, Patients updated: %d, Visits created: %d, Errors: %d",
+        totals['patients_created'], totals['patients_updated'], totals['visits_created'], len(errors)
+    )
+    
+    return {
+        "status": "failed" if failed else "completed",
+        "csv_filename": csv_filename,
+        "total_records": totals['processed_records'],
+        **totals,
+        "errors": errors,
+        "error_count": len(errors)
+    }
+
+
+# Final results go to the ingest_jobs table (see GET /ingest/{task_id}),
+# not the Celery result backend
+@celery_app.task(name="process_csv_workflow", bind=True, ignore_result=True)
 def process_csv_workflow(self, csv_filename: str):
     """
     Main workflow task to process CSV file from S3 with chunked processing
     
     This is an idempotent workflow that:
-    1. Downloads CSV from S3
-    2. Parses CSV in chunks (handles large files efficiently)
+    1. Streams CSV from S3 - files over settings.ingest_segment_bytes are split
+       into line-aligned byte ranges processed in parallel by process_chunk
+       tasks, with finalize_results recording the outcome
+    2. Parses CSV in chunks as it arrives (handles large files efficiently)
     3. For each patient (identified by MRN):
        - If MRN exists: update person info, add new visit
        - If MRN doesn't exist: create patient, person, and visit
     
     Args:
-        csv_filename: Name of the CSV file in S3 bucket
+        csv_filename: Name of the intake file in S3 bucket - .csv, .csv.gz or .parquet
         
     Returns:
-        Dictionary with processing results
+        Dictionary with processing results (also stored in ingest_jobs),
+        or None if the work was handed off to parallel segments
     """
-    print(f"[WORKFLOW START] Processing CSV: {csv_filename}")
+    logger.info("[WORKFLOW START] Processing CSV: %s", csv_filename)
     
     db = SessionLocal()
+    task_id = self.request.id
+    s3_object = None
     
     try:
-        # Step 1: Download CSV from S3
-        print("[STEP 1] Downloading CSV from S3...")
-        s3_service = S3Service()
-        local_filepath = os.path.join(settings.upload_dir, f"downloaded_{csv_filename}")
+        IngestJobService.start_job(db, task_id, csv_filename)
+        s3_service, _ = _get_services()
+        
+        # Step 1: Hand large files off to parallel segment tasks
+        size = s3_service.get_object_size(csv_filename)
+        if size is None:
+            raise Exception(f"Failed to find {csv_filename} in S3")
         
-        download_success = s3_service.download_file(csv_filename, local_filepath)
-        if not download_success:
-            raise Exception(f"Failed to download {csv_filename} from S3")
+        # Only plain CSV with one record per line can be split at line boundaries
+        if size > settings.ingest_segment_bytes and _is_splittable(s3_service, csv_filename):
+            ranges = _segment_ranges(s3_service, csv_filename, size, settings.ingest_segment_bytes)
+            if len(ranges) > 1:
+                logger.info("[STEP 1] Splitting %d bytes into %d parallel segments...", size, len(ranges))
+                # Only the first segment contains the header row; the rest are given its columns
+                header = _read_csv_header(s3_service, csv_filename, size)
+                chord(
+                    [process_chunk.s(csv_filename, start, end, header) for start, end in ranges]
+                )(finalize_results.s(task_id, csv_filename))
+                return None
         
-        # Step 2: Get total record count for progress tracking
-        print("[STEP 2] Analyzing CSV file...")
-        total_records = sum(1 for _ in open(local_filepath)) - 1  # Subtract header
-        print(f"Found {total_records} records to process")
+        # Step 2: Open CSV in S3 as a stream
+        # Parsing overlaps the transfer, and nothing is written to local disk
+        logger.info("[STEP 2] Opening CSV stream from S3...")
+        s3_object = s3_service.open_object(csv_filename)
+        if s3_object is None:
+            raise Exception(f"Failed to open {csv_filename} in S3")
+        logger.info("Streaming %d bytes", s3_object.content_length)
         
         # Step 3: Process records in chunks for memory efficiency
-        print("[STEP 3] Processing records in chunks...")
-        CHUNK_SIZE = 500  # Process 500 records at a time
-        
-        patients_created = 0
-        patients_updated = 0
-        visits_created = 0
-        visits_updated = 0
-        errors = []
-        processed_count = 0
-        
-        # Process CSV in chunks using pandas
-        for chunk_num, chunk_df in enumerate(pd.read_csv(local_filepath, chunksize=CHUNK_SIZE), 1):
-            print(f"\n[CHUNK {chunk_num}] Processing {len(chunk_df)} records...")
-            
-            for idx, row in chunk_df.iterrows():
-                processed_count += 1
-                try:
-                    # Update progress every 100 records
-                    if processed_count % 100 == 0:
-                        progress = int((processed_count / total_records) * 100)
-                        self.update_state(
-                            state='PROGRESS',
-                            meta={
-                                'current': processed_count,
-                                'total': total_records,
-                                'percent': progress,
-                                'patients_created': patients_created,
-                                'patients_updated': patients_updated,
-                                'visits_created': visits_created,
-                                'visits_updated': visits_updated
-                            }
-                        )
-                        print(f"  Progress: {progress}% ({processed_count}/{total_records})")
-                    
-                    # Parse dates using pandas
-                    birth_date = pd.to_datetime(row['birth_date']).date()
-                    visit_date = pd.to_datetime(row['visit_date']).date()
-                
-                    # Check if patient already exists
-                    patient = PatientService.get_patient_by_mrn(db, row['mrn'])
-                    
-                    if patient:
-                        # Patient exists - update person info
-                        PatientService.update_person(
-                            db=db,
-                            patient=patient,
-                            first_name=row['first_name'],
-                            last_name=row['last_name'],
-                            birth_date=birth_date
-                        )
-                        patients_updated += 1
-                    else:
-                        # Patient doesn't exist - create new patient and person
-                        patient = PatientService.create_patient(
-                            db=db,
-                            mrn=row['mrn'],
-                            first_name=row['first_name'],
-                            last_name=row['last_name'],
-                            birth_date=birth_date
-                        )
-                        patients_created += 1
-                    
-                    # Check if visit exists by visit_account_number
-                    visit = PatientService.get_visit_by_account_number(db, row['visit_account_number'])
-                    
-                    if visit:
-                        # Visit exists - update visit information
-                        visit = PatientService.update_visit(
-                            db=db,
-                            visit=visit,
-                            visit_date=visit_date,
-                            reason=row['reason']
-                        )
-                        visits_updated += 1
-                    else:
-                        # Visit doesn't exist - create new visit
-                        visit = PatientService.create_visit(
-                            db=db,
-                            patient_id=patient.id,
-                            visit_account_number=row['visit_account_number'],
-                            visit_date=visit_date,
-                            reason=row['reason']
-                        )
-                        visits_created += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error processing record {processed_count} (MRN={row.get('mrn', 'unknown')}): {str(e)}"
-                    print(f"    ERROR: {error_msg}")
-                    errors.append(error_msg)
-                    # Continue processing other records even if one fails
-                    continue
-            
-            # Commit after each chunk to free up memory
-            db.commit()
-            print(f"[CHUNK {chunk_num}] Committed changes to database")
+        # Progress is the fraction of the object's bytes received so far,
+        # stored in the job's result so GET /ingest/{task_id} shows it
+        logger.info("[STEP 3] Processing records in chunks...")
+        segment_result = _process_segment(
+            db, s3_object, filename=csv_filename,
+            on_progress=lambda progress: IngestJobService.update_progress(db, task_id, progress)
+        )
         
-        # Step 4: Cleanup - remove downloaded file
-        try:
-            os.remove(local_filepath)
-            print(f"\n[CLEANUP] Removed temporary file: {local_filepath}")
-        except Exception as e:
-            print(f"[CLEANUP] Warning: Could not remove temp file: {str(e)}")
+        result = _build_result(csv_filename, [segment_result])
+        IngestJobService.finish_job(db, task_id, csv_filename, result)
+        return result
         
-        # Return results
+    except Exception as e:
+        error_msg = f"Workflow failed: {str(e)}"
+        logger.error("[WORKFLOW FAILED] %s", error_msg)
         result = {
-            "status": "completed",
+            "status": "failed",
             "csv_filename": csv_filename,
-            "total_records": total_records,
-            "processed_records": processed_count,
-            "patients_created": patients_created,
-            "patients_updated": patients_updated,
-            "visits_created": visits_created,
-            "visits_updated": visits_updated,
-            "errors": errors,
-            "error_count": len(errors)
+            "error": error_msg
         }
         
-        print(f"\n[WORKFLOW COMPLETE]")
-        print(f"  Patients created: {patients_created}")
-        print(f"  Patients updated: {patients_updated}")
-        print(f"  Visits created: {visits_created}")
-        print(f"  Errors: {len(errors)}")
+        try:
+            db.rollback()
+            IngestJobService.finish_job(db, task_id, csv_filename, result)
+        except Exception as status_error:
+            logger.error("[WORKFLOW FAILED] Could not record job status: %s", status_error)
         
         return result
+    
+    finally:
+        if s3_object is not None:
+            s3_object.close()
+        db.close()
+
+
+# Results are collected by the chord, so this task keeps them in the result backend
+@celery_app.task(name="process_chunk")
+def process_chunk(csv_filename: str, byte_start: int, byte_end: int, header: List[str]) -> dict:
+    """
+    Process one line-aligned byte range of a CSV file in S3
+    Never raises - failures are reported as errors with the failed flag set,
+    so finalize_results always runs
+    
+    Args:
+        csv_filename: Name of the CSV file in S3 bucket
+        byte_start: First byte of the range (start of a line)
+        byte_end: End of the range, exclusive (just past a line break, or end of file)
+        header: Column names from the file's header row
+        
+    Returns:
+        Segment counters and errors, as returned by _process_segment
+    """
+    logger.info("[SEGMENT START] %s bytes %d-%d", csv_filename, byte_start, byte_end)
+    
+    db = SessionLocal()
+    s3_object = None
+    
+    try:
+        s3_service, _ = _get_services()
+        s3_object = s3_service.open_object(csv_filename, (byte_start, byte_end))
+        if s3_object is None:
+            raise Exception(f"Failed to open {csv_filename} bytes {byte_start}-{byte_end} in S3")
+        
+        # Only the first segment contains the header row; pyarrow reads it from the stream
+        column_names = None if byte_start == 0 else header
+        return _process_segment(db, s3_object, filename=csv_filename, column_names=column_names)
         
     except Exception as e:
-        error_msg = f"Workflow failed: {str(e)}"
-        print(f"\n[WORKFLOW FAILED] {error_msg}")
-        return {
-            "status": "failed",
-            "csv_filename": csv_filename,
-            "error": error_msg
-        }
+        error_msg = f"Segment {byte_start}-{byte_end} failed: {str(e)}"
+        logger.error("[SEGMENT FAILED] %s", error_msg)
+        return {**{key: 0 for key in SEGMENT_COUNT_KEYS}, 'errors': [error_msg], 'failed': True}
     
     finally:
+        if s3_object is not None:
+            s3_object.close()
         db.close()
 
 
+@celery_app.task(name="finalize_results", ignore_result=True)
+def finalize_results(segment_results: List[dict], task_id: str, csv_filename: str) -> dict:
+    """
+    Chord callback: combine segment results and record the workflow outcome
+    
+    Args:
+        segment_results: process_chunk results, in file order
+        task_id: Celery task ID of the process_csv_workflow that split the file
+        csv_filename: Name of the CSV file that was processed
+        
+    Returns:
+        Dictionary with processing results (also stored in ingest_jobs)
+    """
+    result = _build_result(csv_filename, segment_results)
+    
+    db = SessionLocal()
+    try:
+        IngestJobService.finish_job(db, task_id, csv_filename, result)
+    finally:
+        db.close()
+    
+    return result
+
+
 # Task to check workflow status
 @celery_app.task(name="get_task_status")
 def get_task_status(task_id: str):